@@ -6,161 +6,557 @@ Extracts data from JIRA Cloud using REST API and exports to Excel
 
 import requests
 import pandas as pd
+from openpyxl.utils import get_column_letter
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
-import json
+import urllib3
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import functools
+import hashlib
+import pickle
+import re
+import sqlite3
 import sys
+import threading
+import zipfile
+from xml.sax.saxutils import escape, quoteattr
 from datetime import datetime
 import os
 
+import serialization
+
 # Configuration
 JIRA_URL = "https://yourcompany.atlassian.net"  # Replace with your JIRA URL
 USERNAME = "your-email@company.com"             # Replace with your email
 API_TOKEN = "your-api-token"                    # Replace with your API token
 PROJECT_KEY = "YOUR_PROJECT"                    # Replace with your project key
 
-def get_jira_issues(jql_query, max_results=1000):
+# Export columns: header, issue field, how the field becomes a cell and the
+# value used when it is empty
+EXPORT_COLUMNS = (
+    ("Key", None, "key", ""),
+    ("Summary", "summary", "text", ""),
+    ("Status", "status", "name", "Unknown"),
+    ("Assignee", "assignee", "display_name", "Unassigned"),
+    ("Reporter", "reporter", "display_name", "Unknown"),
+    ("Priority", "priority", "name", "Unknown"),
+    ("Issue Type", "issuetype", "name", "Unknown"),
+    ("Components", "components", "names", "None"),
+    ("Labels", "labels", "labels", "None"),
+    ("Created", "created", "date", ""),
+    ("Updated", "updated", "date", ""),
+    ("Due Date", "duedate", "text", "")
+)
+
+# Only exported with --include-description; ADF description trees make up
+# most of a search response, so the field is not even requested otherwise
+DESCRIPTION_COLUMN = ("Description", "description", "adf", "")
+
+# Search paging
+PAGE_SIZE = 1000                                # Requested page size (JIRA caps it at its own maximum)
+MAX_WORKERS = 8                                 # Concurrent page requests
+CACHE_FILE = "jira_cache.sqlite3"               # ETag cache for repeated exports (None to disable)
+
+# Excel export
+CATEGORICAL_COLUMNS = ('Status', 'Assignee', 'Reporter', 'Priority', 'Issue Type')
+
+# Issue fields that can be requested from JIRA, mapped to the sub-keys that are
+# read from each of them (None keeps the whole value)
+ISSUE_PROJECTION = {
+    "summary": None,
+    "status": ("name",),
+    "assignee": ("displayName",),
+    "reporter": ("displayName",),
+    "created": None,
+    "updated": None,
+    "priority": ("name",),
+    "issuetype": ("name",),
+    "description": None,
+    "labels": None,
+    "components": ("name",),
+    "duedate": None
+}
+
+# Only the fields behind the exported columns are requested, since JIRA sends
+# whole field objects (avatars, account ids, ...) for every field asked for
+DEFAULT_FIELDS = tuple(field for _, field, _, _ in EXPORT_COLUMNS if field)
+
+# Static part of every search request
+_BASE_PAYLOAD = {"maxResults": PAGE_SIZE, "fields": DEFAULT_FIELDS, "fieldsByKeys": False}
+
+# Export options offered in the menu - modify as needed
+QUERIES = (
+    ("All Open Issues", f"project = {PROJECT_KEY} AND status != Done"),
+    ("My Issues", f"project = {PROJECT_KEY} AND assignee = currentUser()"),
+    ("Recent Issues", f"project = {PROJECT_KEY} AND created >= -30d"),
+    ("High Priority", f"project = {PROJECT_KEY} AND priority in (Highest, High)")
+)
+
+def _create_session():
+    """
+    Create an authenticated HTTP session with a connection pool sized for the
+    concurrent page requests, retrying rate-limited and failed requests
+    """
+    session = requests.Session()
+    session.auth = HTTPBasicAuth(USERNAME, API_TOKEN)
+    session.headers.update({
+        "Accept": "application/json",
+        "Content-Type": "application/json",
+        # JIRA's JSON is highly redundant; ask for gzip/deflate (plus br/zstd
+        # when their decoders are installed). Decompression runs in C and
+        # response.content is already decompressed
+        "Accept-Encoding": make_headers(accept_encoding=True)["accept-encoding"]
+    })
+    
+    # The search endpoint is a read-only POST, so it is safe to retry
+    retries = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=None
+    )
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retries)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+# Shared by every JIRA call so connections (and their TLS handshakes) are reused
+SESSION = _create_session()
+
+class _ETagCache:
+    """
+    Parsed search pages and their ETags, keyed by request payload
+    
+    Stored in SQLite rather than shelve: pages are read and written from the
+    fetch threads, and the dbm.sqlite3 backend that shelve uses from Python
+    3.13 only works on the thread that opened it. A cache that cannot be
+    opened or used is disabled, and the export carries on uncached.
+    """
+    
+    def __init__(self, filename):
+        self._lock = threading.Lock()
+        self._db = None
+        if filename:
+            try:
+                self._db = sqlite3.connect(filename, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS pages (key TEXT PRIMARY KEY, etag TEXT, page BLOB)"
+                )
+            except sqlite3.Error as e:
+                self._disable(e)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        with self._lock:
+            if self._db is None:
+                return
+            try:
+                # Commit once for the whole export rather than once per page
+                self._db.commit()
+            except sqlite3.Error as e:
+                self._disable(e)
+            else:
+                self._db.close()
+                self._db = None
+    
+    def _disable(self, error):
+        print(f"⚠️  ETag cache unavailable, fetching without it: {error}")
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+    
+    @property
+    def enabled(self):
+        return self._db is not None
+    
+    @staticmethod
+    def key(payload):
+        return hashlib.sha256(serialization.dumps(payload)).hexdigest()
+    
+    def get(self, key):
+        with self._lock:
+            if self._db is None:
+                return None
+            try:
+                row = self._db.execute(
+                    "SELECT etag, page FROM pages WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                self._disable(e)
+                return None
+        return (row[0], pickle.loads(row[1])) if row else None
+    
+    def put(self, key, etag, page):
+        data = pickle.dumps(page, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            if self._db is None:
+                return
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO pages VALUES (?, ?, ?)", (key, etag, data)
+                )
+            except sqlite3.Error as e:
+                self._disable(e)
+
+def _fetch_page(url, payload, projection, start_at, cache, stream=False, extract=None):
+    """
+    Fetch a single page of search results starting at the given offset
+    
+    Revalidates against the cached copy with If-None-Match, so an unchanged
+    page comes back as 304 or 412 with no body to transfer or parse. With
+    stream the issues are parsed while the body is still arriving; the page
+    then only holds its issues. extract, when given, is applied to each issue
+    of the returned page; pages that will not be cached are extracted as they
+    stream, so only one issue dict is held at a time.
+    """
+    page_payload = {**payload, "startAt": start_at}
+    key = cache.key(page_payload)
+    cached = cache.get(key)
+    
+    headers = {"If-None-Match": cached[0]} if cached else None
+    with SESSION.post(url, json=page_payload, headers=headers, stream=stream) as response:
+        # If-None-Match on a POST is answered with 412 rather than 304
+        # (RFC 9110), so both mean the cached copy is still current
+        if cached and response.status_code in (304, 412):
+            page = cached[1]
+        else:
+            response.raise_for_status()
+            etag = response.headers.get("ETag") if cache.enabled else None
+            if stream:
+                # Let urllib3 undo the gzip/deflate encoding as the bytes are read
+                response.raw.decode_content = True
+                issues = serialization.iter_issues(response.raw)
+                if extract and not etag:
+                    return {'issues': list(map(extract, issues))}
+                page = {'issues': list(issues)}
+            else:
+                # Parse the raw body bytes directly, skipping requests' str decode
+                page = serialization.load_issues(response.content, projection)
+            if etag:
+                # The cache keeps the issue dicts so a later run can re-extract them
+                cache.put(key, etag, page)
+    
+    if extract:
+        return {**page, 'issues': list(map(extract, page.get('issues', [])))}
+    return page
+
+def get_jira_issues(jql_query, max_results=None, *, fields=None, extract=None):
     """
     Fetch issues from JIRA using JQL query
+    
+    Requests the given issue fields (DEFAULT_FIELDS if not given); fields
+    missing from ISSUE_PROJECTION are kept whole. The first page tells us the
+    total and the page size JIRA actually enforces; the remaining pages are
+    then fetched concurrently. Fetches every matching issue unless
+    max_results is given.
+    
+    extract, when given, is applied to every issue in the thread that fetched
+    its page, so that work overlaps the downloads still in flight and each
+    page's issue dicts are released as soon as it is done; 'issues' then holds
+    the extracted values.
     """
     url = f"{JIRA_URL}/rest/api/3/search"
     
-    auth = HTTPBasicAuth(USERNAME, API_TOKEN)
-    headers = {
-        "Accept": "application/json",
-        "Content-Type": "application/json"
-    }
-    
-    payload = {
-        "jql": jql_query,
-        "maxResults": max_results,
-        "fields": [
-            "key", "summary", "status", "assignee", "reporter", 
-            "created", "updated", "priority", "issuetype",
-            "description", "labels", "components", "fixVersions",
-            "resolution", "resolutiondate", "duedate"
-        ]
-    }
+    payload = {"jql": jql_query, **_BASE_PAYLOAD}
+    if fields is not None:
+        payload["fields"] = tuple(fields)
+    projection = {name: ISSUE_PROJECTION.get(name) for name in payload["fields"]}
+    
+    def fetch(start_at):
+        page = _fetch_page(
+            url, payload, projection, start_at, cache,
+            stream=serialization.STREAMING, extract=extract
+        )
+        return page.get('issues', [])
     
     try:
-        response = requests.post(url, json=payload, auth=auth, headers=headers)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        with _ETagCache(CACHE_FILE) as cache:
+            # The first page is parsed whole since the totals come with it
+            first_page = _fetch_page(url, payload, projection, 0, cache)
+            first_issues = first_page.get('issues', [])
+            total = first_page.get('total') or len(first_issues)
+            wanted = total if max_results is None else min(total, max_results)
+            
+            # JIRA silently caps maxResults, so page by what it returned
+            page_size = first_page.get('maxResults') or len(first_issues)
+            offsets = range(len(first_issues), wanted, page_size) if page_size else ()
+            payload["maxResults"] = page_size
+            
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                pages = executor.map(fetch, offsets)
+                issues = list(map(extract, first_issues)) if extract else first_issues
+                for page in pages:
+                    issues.extend(page)
+        
+        return {'total': total, 'issues': issues[:wanted]}
+    except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError) as e:
+        # Streamed bodies are read from urllib3 directly, so its errors are
+        # not wrapped by requests
         print(f"Error fetching JIRA issues: {e}")
         return None
+    except ValueError as e:
+        print(f"Error parsing JIRA response: {e}")
+        return None
 
-def format_issue_data(issues_data):
+def _adf_first_text(adf):
+    """
+    Get the first text fragment of an ADF document, in document order
+    """
+    stack = [adf]
+    while stack:
+        node = stack.pop()
+        if not isinstance(node, dict):
+            continue
+        if node.get('type') == 'text':
+            return node.get('text') or ''
+        stack.extend(reversed(node.get('content') or ()))
+    return ''
+
+# Never mutated; stands in for missing JSON objects in the generated extractor
+_EMPTY = {}
+
+# Python expression for each kind of export column, reading the issue's
+# fields as `f`
+_EXTRACT_TEMPLATES = {
+    'key': "issue.get('key') or {default!r}",
+    'text': "f.get({field!r}) or {default!r}",
+    'name': "(f.get({field!r}) or _EMPTY).get('name') or {default!r}",
+    'display_name': "(f.get({field!r}) or _EMPTY).get('displayName') or {default!r}",
+    'date': "(f.get({field!r}) or '')[:10] or {default!r}",
+    'names': "', '.join([item['name'] for item in f.get({field!r}) or () if item.get('name')]) or {default!r}",
+    'labels': "', '.join(f.get({field!r}) or ()) or {default!r}",
+    'adf': "_adf_first_text(f.get({field!r})) or {default!r}"
+}
+
+@functools.lru_cache(maxsize=None)
+def _build_extractor(columns):
+    """
+    Generate a function turning one issue into a row tuple for the columns
+    
+    The column spec is fixed, so it is compiled once into a single
+    straight-line function instead of being interpreted for every issue.
+    """
+    cells = ''.join(
+        f"        {_EXTRACT_TEMPLATES[kind].format(field=field, default=default)},\n"
+        for _, field, kind, default in columns
+    )
+    source = (
+        "def _extract(issue):\n"
+        "    f = issue.get('fields') or _EMPTY\n"
+        "    return (\n"
+        f"{cells}"
+        "    )\n"
+    )
+    namespace = {'__name__': __name__, '_EMPTY': _EMPTY, '_adf_first_text': _adf_first_text}
+    exec(source, namespace)
+    return namespace['_extract']
+
+def format_issue_data(issues_data, columns=EXPORT_COLUMNS, extracted=False):
     """
     Format JIRA issues data for Excel export
+    
+    Each issue is turned into a row tuple by the extractor generated for the
+    columns; pass extracted=True when get_jira_issues already produced the
+    rows. The CATEGORICAL_COLUMNS are returned as pandas categoricals.
     """
-    issues_list = []
+    issues = issues_data.get('issues', [])
+    rows = issues if extracted else list(map(_build_extractor(columns), issues))
+    df = pd.DataFrame(rows, columns=[header for header, _, _, _ in columns])
     
-    for issue in issues_data.get('issues', []):
-        fields = issue.get('fields', {})
-        
-        # Extract assignee information
-        assignee = fields.get('assignee')
-        assignee_name = assignee.get('displayName') if assignee else 'Unassigned'
-        
-        # Extract reporter information
-        reporter = fields.get('reporter')
-        reporter_name = reporter.get('displayName') if reporter else 'Unknown'
-        
-        # Extract status
-        status = fields.get('status', {})
-        status_name = status.get('name', 'Unknown')
-        
-        # Extract priority
-        priority = fields.get('priority', {})
-        priority_name = priority.get('name', 'Unknown')
-        
-        # Extract issue type
-        issuetype = fields.get('issuetype', {})
-        issuetype_name = issuetype.get('name', 'Unknown')
-        
-        # Extract components
-        components = fields.get('components', [])
-        components_list = [comp.get('name') for comp in components]
-        components_str = ', '.join(components_list) if components_list else 'None'
-        
-        # Extract labels
-        labels = fields.get('labels', [])
-        labels_str = ', '.join(labels) if labels else 'None'
-        
-        # Format dates
-        created_date = fields.get('created', '')[:10] if fields.get('created') else ''
-        updated_date = fields.get('updated', '')[:10] if fields.get('updated') else ''
-        due_date = fields.get('duedate', '') if fields.get('duedate') else ''
-        
-        issue_dict = {
-            'Key': issue.get('key', ''),
-            'Summary': fields.get('summary', ''),
-            'Status': status_name,
-            'Assignee': assignee_name,
-            'Reporter': reporter_name,
-            'Priority': priority_name,
-            'Issue Type': issuetype_name,
-            'Components': components_str,
-            'Labels': labels_str,
-            'Created': created_date,
-            'Updated': updated_date,
-            'Due Date': due_date,
-            'Description': fields.get('description', {}).get('content', [{}])[0].get('content', [{}])[0].get('text', '') if fields.get('description') else ''
-        }
-        
-        issues_list.append(issue_dict)
+    # Only a handful of distinct values repeat across thousands of rows, so
+    # store them once as categories
+    return df.astype({
+        column: 'category' for column in CATEGORICAL_COLUMNS if column in df
+    })
+
+def _column_widths(df):
+    """
+    Fit each column to its longest value, header included (max width of 50)
+    """
+    if df.empty:
+        # apply() on an empty frame returns a frame, not per-column lengths
+        return [min(len(str(name)) + 2, 50) for name in df.columns]
     
-    return issues_list
+    # One vectorized string-length sweep per column instead of a per-cell loop
+    lengths = df.astype(str).apply(lambda column: column.str.len().max()).fillna(0)
+    return [
+        min(max(int(length), len(str(name))) + 2, 50)
+        for name, length in lengths.items()
+    ]
+
+# Static parts of a minimal xlsx package
+_CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '{sheets}'
+    '</Types>'
+)
+_CONTENT_TYPES_SHEET_XML = (
+    '<Override PartName="/xl/worksheets/sheet{index}.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+)
+_ROOT_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets>{sheets}</sheets>'
+    '</workbook>'
+)
+_WORKBOOK_SHEET_XML = '<sheet name={name} sheetId="{index}" r:id="rId{index}"/>'
+_WORKBOOK_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '{sheets}'
+    '<Relationship Id="rId{styles_index}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK_RELS_SHEET_XML = (
+    '<Relationship Id="rId{index}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet{index}.xml"/>'
+)
+# Style 1 is the bold header font
+_STYLES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="2">'
+    '<font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font>'
+    '</fonts>'
+    '<fills count="2">'
+    '<fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill>'
+    '</fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+    '</cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
 
-def export_to_excel(issues_list, filename=None):
+# Control characters that are not allowed in XML 1.0
+_ILLEGAL_XML_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+def _cell_xml(ref, value, style=None):
+    """
+    Serialize a single cell, as a number or an inline string
+    """
+    if value is None or value == '' or value != value:  # Empty or NaN
+        return ''
+    style_attr = f' s="{style}"' if style else ''
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f'<c r="{ref}"{style_attr}><v>{value}</v></c>'
+    text = escape(_ILLEGAL_XML_CHARS.sub('', str(value)))
+    return f'<c r="{ref}" t="inlineStr"{style_attr}><is><t xml:space="preserve">{text}</t></is></c>'
+
+def _write_sheet_xml(stream, df, widths=None):
     """
-    Export issues data to Excel file
+    Stream a DataFrame as worksheet XML, one row at a time
+    """
+    letters = [get_column_letter(i) for i in range(1, len(df.columns) + 1)]
+    
+    stream.write(
+        b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    )
+    if widths:
+        cols = ''.join(
+            f'<col min="{i}" max="{i}" width="{width}" customWidth="1"/>'
+            for i, width in enumerate(widths, 1)
+        )
+        stream.write(f'<cols>{cols}</cols>'.encode('utf-8'))
+    stream.write(b'<sheetData>')
+    
+    header = ''.join(
+        _cell_xml(f'{letter}1', name, style=1)
+        for letter, name in zip(letters, df.columns)
+    )
+    stream.write(f'<row r="1">{header}</row>'.encode('utf-8'))
+    
+    for r, row in enumerate(df.itertuples(index=False, name=None), 2):
+        cells = ''.join(
+            _cell_xml(f'{letter}{r}', value)
+            for letter, value in zip(letters, row)
+        )
+        stream.write(f'<row r="{r}">{cells}</row>'.encode('utf-8'))
+    
+    stream.write(b'</sheetData></worksheet>')
+
+def _write_xlsx_direct(filename, sheets):
+    """
+    Write an xlsx package by emitting its XML parts directly
+    
+    sheets is a list of (title, DataFrame, widths) tuples. Rows are streamed
+    into the package one at a time, so memory use does not grow with the row
+    count.
+    """
+    indexes = range(1, len(sheets) + 1)
+    
+    # Level 1 deflate is several times faster than the default and the
+    # repetitive sheet XML still compresses well
+    with zipfile.ZipFile(filename, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=1) as package:
+        package.writestr('[Content_Types].xml', _CONTENT_TYPES_XML.format(
+            sheets=''.join(_CONTENT_TYPES_SHEET_XML.format(index=i) for i in indexes)
+        ))
+        package.writestr('_rels/.rels', _ROOT_RELS_XML)
+        package.writestr('xl/workbook.xml', _WORKBOOK_XML.format(sheets=''.join(
+            _WORKBOOK_SHEET_XML.format(name=quoteattr(title), index=i)
+            for i, (title, _, _) in zip(indexes, sheets)
+        )))
+        package.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS_XML.format(
+            sheets=''.join(_WORKBOOK_RELS_SHEET_XML.format(index=i) for i in indexes),
+            styles_index=len(sheets) + 1
+        ))
+        package.writestr('xl/styles.xml', _STYLES_XML)
+        
+        for i, (_, df, widths) in zip(indexes, sheets):
+            with package.open(f'xl/worksheets/sheet{i}.xml', 'w') as stream:
+                _write_sheet_xml(stream, df, widths)
+
+def export_to_excel(df, filename=None):
+    """
+    Export issues DataFrame to Excel file
+    
+    Both sheets are written as XML straight into the xlsx package, without
+    going through pandas' Excel writers or a cell object per value.
     """
     if not filename:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"jira_export_{timestamp}.xlsx"
     
-    # Create DataFrame
-    df = pd.DataFrame(issues_list)
+    # Summary sheet
+    metrics = [
+        ('Total Issues', len(df)),
+        ('Export Date', datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+        ('Project', PROJECT_KEY)
+    ]
+    for column, metric in (('Assignee', 'Unique Assignees'), ('Status', 'Unique Statuses')):
+        if column in df:
+            metrics.append((metric, df[column].nunique()))
     
-    # Create Excel writer with formatting
-    with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-        # Write main data
-        df.to_excel(writer, sheet_name='JIRA Issues', index=False)
-        
-        # Get the workbook and worksheet
-        workbook = writer.book
-        worksheet = writer.sheets['JIRA Issues']
-        
-        # Auto-adjust column widths
-        for column in worksheet.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            
-            adjusted_width = min(max_length + 2, 50)  # Max width of 50
-            worksheet.column_dimensions[column_letter].width = adjusted_width
-        
-        # Add summary sheet
-        summary_data = {
-            'Metric': ['Total Issues', 'Export Date', 'Project', 'Unique Assignees', 'Unique Statuses'],
-            'Value': [
-                len(issues_list),
-                datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                PROJECT_KEY,
-                len(set(issue['Assignee'] for issue in issues_list)),
-                len(set(issue['Status'] for issue in issues_list))
-            ]
-        }
-        
-        summary_df = pd.DataFrame(summary_data)
-        summary_df.to_excel(writer, sheet_name='Summary', index=False)
+    summary_df = pd.DataFrame(metrics, columns=['Metric', 'Value'])
+    
+    sheets = [
+        ('JIRA Issues', df, _column_widths(df)),
+        ('Summary', summary_df, None)
+    ]
+    
+    _write_xlsx_direct(filename, sheets)
     
     print(f"✅ Excel file exported: {filename}")
     return filename
@@ -169,45 +565,51 @@ def main():
     """
     Main function to export JIRA data to Excel
     """
+    parser = argparse.ArgumentParser(description="Export JIRA issues to Excel")
+    parser.add_argument(
+        "--include-description",
+        action="store_true",
+        help="also export the first text of each issue's description (much larger downloads)"
+    )
+    args = parser.parse_args()
+    
+    columns = EXPORT_COLUMNS
+    if args.include_description:
+        columns += (DESCRIPTION_COLUMN,)
+    fields = tuple(field for _, field, _, _ in columns if field)
+    
     print("🔗 JIRA to Excel Export Tool")
     print("============================")
     print(f"JIRA URL: {JIRA_URL}")
     print(f"Project: {PROJECT_KEY}")
     print("")
     
-    # Example JQL queries - modify as needed
-    jql_queries = {
-        "All Open Issues": f"project = {PROJECT_KEY} AND status != Done",
-        "My Issues": f"project = {PROJECT_KEY} AND assignee = currentUser()",
-        "Recent Issues": f"project = {PROJECT_KEY} AND created >= -30d",
-        "High Priority": f"project = {PROJECT_KEY} AND priority in (Highest, High)"
-    }
-    
     print("📋 Available Export Options:")
-    for i, (name, query) in enumerate(jql_queries.items(), 1):
+    for i, (name, query) in enumerate(QUERIES, 1):
         print(f"   {i}. {name}: {query}")
     
-    print("   5. Custom JQL Query")
+    custom_choice = len(QUERIES) + 1
+    print(f"   {custom_choice}. Custom JQL Query")
     print("")
     
     try:
-        choice = input("Select export option (1-5): ").strip()
+        choice = input(f"Select export option (1-{custom_choice}): ").strip()
         
-        if choice in ['1', '2', '3', '4']:
-            query_name = list(jql_queries.keys())[int(choice) - 1]
-            jql_query = list(jql_queries.values())[int(choice) - 1]
-        elif choice == '5':
+        if choice.isdigit() and 1 <= int(choice) <= len(QUERIES):
+            query_name, jql_query = QUERIES[int(choice) - 1]
+        elif choice == str(custom_choice):
             jql_query = input("Enter custom JQL query: ").strip()
             query_name = "Custom Query"
         else:
             print("Invalid choice. Using default query.")
-            jql_query = jql_queries["All Open Issues"]
-            query_name = "All Open Issues"
+            query_name, jql_query = QUERIES[0]
         
         print(f"\n🔍 Executing query: {jql_query}")
         
-        # Fetch issues from JIRA
-        issues_data = get_jira_issues(jql_query)
+        # Fetch issues from JIRA, extracting the rows while pages download
+        issues_data = get_jira_issues(
+            jql_query, fields=fields, extract=_build_extractor(columns)
+        )
         
         if not issues_data:
             print("❌ Failed to fetch issues from JIRA")
@@ -223,7 +625,7 @@ def main():
             return
         
         # Format data for Excel
-        formatted_issues = format_issue_data(issues_data)
+        formatted_issues = format_issue_data(issues_data, columns, extracted=True)
         
         # Export to Excel
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -248,6 +650,7 @@ if __name__ == "__main__":
     except ImportError as e:
         print("❌ Missing required packages. Install with:")
         print("   pip install pandas openpyxl requests")
+        print("   (optional, faster JSON parsing: pip install orjson pysimdjson ijson)")
         sys.exit(1)
     
     main()
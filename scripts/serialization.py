@@ -0,0 +1,120 @@
+"""
+JSON serialization helpers for the JIRA export scripts
+Uses orjson / pysimdjson / ijson when they are installed and falls back to
+the standard library
+"""
+
+import json
+import threading
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Streaming only pays off with ijson's C backend; the pure-Python backends are
+# slower than parsing the whole response at once
+STREAMING = ijson is not None and ijson.backend == 'yajl2_c'
+
+# Parsers are not thread-safe, so each thread reuses its own; this way the
+# parser's internal buffers are only allocated once per thread
+_local = threading.local()
+
+_MISSING = object()
+
+
+def loads(data):
+    """
+    Parse a JSON document from bytes or str
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj):
+    """
+    Serialize an object to JSON bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+
+def _materialize(value):
+    """
+    Convert a simdjson proxy into plain Python objects
+    """
+    if isinstance(value, simdjson.Object):
+        return value.as_dict()
+    if isinstance(value, simdjson.Array):
+        return value.as_list()
+    return value
+
+
+def _project(value, keys):
+    """
+    Keep only the given keys of an object, or of each object in an array
+    """
+    if keys is None or value is None:
+        return _materialize(value)
+    if isinstance(value, simdjson.Array):
+        return [_project(item, keys) for item in value]
+    return {key: _materialize(value.get(key)) for key in keys}
+
+
+def load_issues(data, projection):
+    """
+    Parse a JIRA search response into a plain dict
+
+    projection maps each issue field name to the tuple of sub-keys that should
+    be kept (None keeps the whole value). With pysimdjson only those parts of
+    the document are turned into Python objects; otherwise the full response
+    is parsed.
+    """
+    if simdjson is None:
+        return loads(data)
+
+    parser = getattr(_local, 'parser', None)
+    if parser is None:
+        parser = _local.parser = simdjson.Parser()
+
+    doc = parser.parse(data)
+    result = {
+        key: doc.get(key) for key in ('startAt', 'maxResults', 'total')
+    }
+
+    issues = []
+    for issue in doc.get('issues', ()):
+        fields = issue.get('fields')
+        projected = {}
+        if fields is not None:
+            for name, keys in projection.items():
+                value = fields.get(name, _MISSING)
+                if value is not _MISSING:
+                    projected[name] = _project(value, keys)
+        issues.append({'key': issue.get('key'), 'fields': projected})
+
+    result['issues'] = issues
+    return result
+
+
+def iter_issues(stream):
+    """
+    Incrementally parse the issues of a JIRA search response from a file-like
+    object, yielding each one as soon as its bytes have been read
+    """
+    try:
+        yield from ijson.items(stream, 'issues.item', use_float=True)
+    except ijson.JSONError as e:
+        raise ValueError(str(e)) from e
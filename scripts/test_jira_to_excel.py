@@ -0,0 +1,225 @@
+"""
+Tests for jira-to-excel.py
+
+Run with: python -m unittest test_jira_to_excel
+"""
+
+import importlib.util
+import io
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+_spec = importlib.util.spec_from_file_location(
+    'jira_to_excel', os.path.join(os.path.dirname(__file__), 'jira-to-excel.py'))
+jira_to_excel = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(jira_to_excel)
+
+
+def _response(status_code, headers=None, content=b''):
+    response = mock.MagicMock(status_code=status_code, headers=headers or {}, content=content)
+    response.__enter__.return_value = response
+    return response
+
+
+def _temp_path(test, name):
+    """
+    Path of a file in a temporary directory removed when the test finishes
+    """
+    tmpdir = tempfile.TemporaryDirectory()
+    test.addCleanup(tmpdir.cleanup)
+    return os.path.join(tmpdir.name, name)
+
+
+class FetchPageRevalidationTest(unittest.TestCase):
+    
+    URL = 'https://jira.example.com/rest/api/3/search'
+    PAYLOAD = {'jql': 'project = TEST', 'maxResults': 50}
+    CACHED_PAGE = {'total': 1, 'issues': [{'key': 'TEST-1', 'fields': {}}]}
+    
+    def setUp(self):
+        self.cache = jira_to_excel._ETagCache(_temp_path(self, 'cache'))
+        self.addCleanup(self.cache.__exit__, None, None, None)
+        key = self.cache.key({**self.PAYLOAD, 'startAt': 0})
+        self.cache.put(key, '"v1"', self.CACHED_PAGE)
+    
+    def _fetch(self, response, extract=None):
+        with mock.patch.object(jira_to_excel.SESSION, 'post', return_value=response) as post:
+            page = jira_to_excel._fetch_page(
+                self.URL, self.PAYLOAD, {}, 0, self.cache, extract=extract)
+        self.assertEqual(post.call_args.kwargs['headers'], {'If-None-Match': '"v1"'})
+        return page
+    
+    def test_not_modified_returns_cached_page(self):
+        response = _response(304)
+        self.assertEqual(self._fetch(response), self.CACHED_PAGE)
+        response.raise_for_status.assert_not_called()
+    
+    def test_precondition_failed_returns_cached_page(self):
+        response = _response(412)
+        self.assertEqual(self._fetch(response), self.CACHED_PAGE)
+        response.raise_for_status.assert_not_called()
+    
+    def test_changed_page_replaces_cached_copy(self):
+        response = _response(200, {'ETag': '"v2"'}, b'{"total": 0, "issues": []}')
+        page = self._fetch(response)
+        self.assertEqual(page['issues'], [])
+        key = self.cache.key({**self.PAYLOAD, 'startAt': 0})
+        self.assertEqual(self.cache.get(key), ('"v2"', page))
+    
+    def test_cached_page_is_extracted(self):
+        page = self._fetch(_response(412), extract=lambda issue: (issue['key'],))
+        self.assertEqual(page['issues'], [('TEST-1',)])
+
+
+class FetchPageStreamingTest(unittest.TestCase):
+    
+    URL = 'https://jira.example.com/rest/api/3/search'
+    ISSUES = [{'key': 'TEST-1', 'fields': {}}, {'key': 'TEST-2', 'fields': {}}]
+    
+    def _fetch(self, response, cache):
+        events = []
+        
+        def iter_issues(stream):
+            for issue in self.ISSUES:
+                events.append(('parsed', issue['key']))
+                yield issue
+        
+        def extract(issue):
+            events.append(('extracted', issue['key']))
+            return (issue['key'],)
+        
+        with mock.patch.object(jira_to_excel.SESSION, 'post', return_value=response), \
+                mock.patch.object(jira_to_excel.serialization, 'iter_issues', iter_issues):
+            page = jira_to_excel._fetch_page(self.URL, {}, {}, 0, cache, stream=True, extract=extract)
+        self.assertEqual(page['issues'], [('TEST-1',), ('TEST-2',)])
+        return events
+    
+    def test_uncacheable_page_is_extracted_while_streaming(self):
+        with jira_to_excel._ETagCache(None) as cache:
+            events = self._fetch(_response(200, {'ETag': '"v1"'}), cache)
+        self.assertEqual(events, [
+            ('parsed', 'TEST-1'), ('extracted', 'TEST-1'),
+            ('parsed', 'TEST-2'), ('extracted', 'TEST-2'),
+        ])
+    
+    def test_cacheable_page_keeps_issue_dicts(self):
+        with jira_to_excel._ETagCache(_temp_path(self, 'cache')) as cache:
+            events = self._fetch(_response(200, {'ETag': '"v1"'}), cache)
+            self.assertEqual(cache.get(cache.key({'startAt': 0})), ('"v1"', {'issues': self.ISSUES}))
+        self.assertEqual(events[:2], [('parsed', 'TEST-1'), ('parsed', 'TEST-2')])
+
+
+class GetJiraIssuesTest(unittest.TestCase):
+    
+    @staticmethod
+    def _page(url, payload, projection, start_at, cache, **kwargs):
+        issues = [{'key': f'TEST-{n}', 'fields': {}} for n in range(start_at, start_at + 50)]
+        return {'total': 200, 'maxResults': 50, 'issues': issues}
+    
+    def _get(self, *args, **kwargs):
+        with mock.patch.object(jira_to_excel, 'CACHE_FILE', None), \
+                mock.patch.object(jira_to_excel, '_fetch_page', side_effect=self._page) as fetch:
+            result = jira_to_excel.get_jira_issues(*args, **kwargs)
+        return result, fetch
+    
+    def test_max_results_is_second_positional_argument(self):
+        result, fetch = self._get('project = TEST', 60)
+        self.assertEqual(result['total'], 200)
+        self.assertEqual(len(result['issues']), 60)
+        self.assertEqual(fetch.call_count, 2)
+    
+    def test_unknown_field_is_requested_whole(self):
+        _, fetch = self._get('project = TEST', fields=('summary', 'customfield_10001'))
+        url, payload, projection, start_at, cache = fetch.call_args_list[0].args
+        self.assertEqual(payload['fields'], ('summary', 'customfield_10001'))
+        self.assertEqual(projection, {'summary': None, 'customfield_10001': None})
+
+
+
+class GetJiraIssuesCacheTest(unittest.TestCase):
+    
+    TOTAL = 120
+    PAGE_SIZE = 50
+    
+    def setUp(self):
+        self.cache_file = _temp_path(self, 'cache.sqlite3')
+        self.requests = []
+    
+    def _post(self, url, json, headers=None, stream=False):
+        """
+        Answer a search like JIRA: one ETag per page, 412 when it still matches
+        """
+        start_at = json['startAt']
+        etag = f'"page-{start_at}"'
+        self.requests.append((start_at, headers, threading.current_thread()))
+        if headers and headers.get('If-None-Match') == etag:
+            return _response(412)
+        issues = [
+            {'key': f'TEST-{n}', 'fields': {'summary': f'Issue {n}'}}
+            for n in range(start_at, min(start_at + self.PAGE_SIZE, self.TOTAL))
+        ]
+        body = jira_to_excel.serialization.dumps(
+            {'startAt': start_at, 'maxResults': self.PAGE_SIZE, 'total': self.TOTAL, 'issues': issues})
+        response = _response(200, {'ETag': etag}, body)
+        response.raw = io.BytesIO(body)
+        return response
+    
+    def _export(self, cache_file):
+        self.requests.clear()
+        with mock.patch.object(jira_to_excel, 'CACHE_FILE', cache_file), \
+                mock.patch.object(jira_to_excel.SESSION, 'post', side_effect=self._post):
+            result = jira_to_excel.get_jira_issues('project = TEST', fields=('summary',))
+        self.assertEqual([issue['key'] for issue in result['issues']],
+                         [f'TEST-{n}' for n in range(self.TOTAL)])
+        return result
+    
+    def test_pages_are_cached_and_revalidated_across_threads(self):
+        first = self._export(self.cache_file)
+        self.assertEqual(sorted(start_at for start_at, _, _ in self.requests), [0, 50, 100])
+        self.assertTrue(any(thread is not threading.main_thread()
+                            for _, _, thread in self.requests))
+        
+        second = self._export(self.cache_file)
+        self.assertEqual(second, first)
+        self.assertEqual(
+            sorted((start_at, headers) for start_at, headers, _ in self.requests),
+            [(n, {'If-None-Match': f'"page-{n}"'}) for n in (0, 50, 100)]
+        )
+    
+    def test_unusable_cache_file_exports_uncached(self):
+        cache_file = os.path.join(os.path.dirname(self.cache_file), 'missing', 'cache.sqlite3')
+        with mock.patch('builtins.print'):
+            self._export(cache_file)
+            self._export(cache_file)
+        self.assertTrue(all(headers is None for _, headers, _ in self.requests))
+
+
+class ExtractorDefaultsTest(unittest.TestCase):
+    
+    def test_every_kind_falls_back_to_column_default(self):
+        kinds = ('key', 'text', 'name', 'display_name', 'date', 'names', 'labels', 'adf')
+        columns = tuple(
+            (kind, None if kind == 'key' else f'field_{kind}', kind, f'<{kind}>')
+            for kind in kinds
+        )
+        extract = jira_to_excel._build_extractor(columns)
+        self.assertEqual(extract({'fields': {}}), tuple(f'<{kind}>' for kind in kinds))
+
+
+class EmptyExportTest(unittest.TestCase):
+    
+    def test_empty_result_writes_workbook(self):
+        filename = _temp_path(self, 'empty.xlsx')
+        
+        df = jira_to_excel.format_issue_data({'issues': []})
+        self.assertEqual(jira_to_excel._column_widths(df),
+                         [len(name) + 2 for name in df.columns])
+        self.assertEqual(jira_to_excel.export_to_excel(df, filename), filename)
+        self.assertTrue(os.path.getsize(filename))
+
+
+if __name__ == '__main__':
+    unittest.main()